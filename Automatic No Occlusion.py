@@ -6,7 +6,16 @@ The Automatic Script that needs human intervention after 4 cameras render
 """
 
 import bpy
+import cProfile
+import numpy as np
 import os
+import pstats
+import re
+import shutil
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
 # --------------------------
 # CONFIGURATION
@@ -18,6 +27,7 @@ SUBJECT_FILE = os.path.join(WORKSPACE_DIR, "subjects", f"subject{SUBJECT_NUM:04d
 
 BVH_FILE = os.path.join(WORKSPACE_DIR, "bvh_pool", "02_01.bvh")  
 #  Change this to any test BVH you want
+BVH_NAME = os.path.splitext(os.path.basename(BVH_FILE))[0]
 
 # Camera & Empty Parameters
 CAMERA_RADIUS = 10      # Distance from camera array center to cameras
@@ -26,29 +36,102 @@ EMPTY_HEIGHT = 1.0     # Empty height (meters)
 CAMERA_COUNT = 11     # Number of cameras
 CAMERA_ANGLE_STEP = 18   # Degrees between cameras
 SUBJECT_START_OFFSET = -2.0  # Subject starts this far behind the camera array center (meters, along -Y)
+HIDDEN_SUBJECT_PARTS = {"Hair", "Eyebrows", "Eyelashes", "Tongue", "Teeth"}  # MPFB parts not rendered
+
+# Camera positions, precomputed once (offset by +90° so 0° is in front, positive Y axis)
+CAMERA_ANGLES_DEG = np.arange(CAMERA_COUNT) * CAMERA_ANGLE_STEP  # 0°, 18°, ..., 180°
+CAMERA_X = CAMERA_RADIUS * np.cos(np.deg2rad(CAMERA_ANGLES_DEG - 90))  # Cameras centered at (0, 0)
+CAMERA_Y = CAMERA_RADIUS * np.sin(np.deg2rad(CAMERA_ANGLES_DEG - 90))
+
+# Camera rig template, shared by every subject/BVH; the name encodes the rig parameters so changing them builds a new one
+CAMERA_RIG_BLEND = os.path.join(
+    WORKSPACE_DIR, "baked",
+    f"camera_rig_offset_{CAMERA_COUNT}x{CAMERA_ANGLE_STEP}deg_r{CAMERA_RADIUS}_h{CAMERA_HEIGHT}_t{EMPTY_HEIGHT}.blend"
+)
 
 # --------------------------
 # RENDER CONFIGURATION
 # --------------------------
-RENDER_OUTPUT_DIR = os.path.join(WORKSPACE_DIR, "renders", f"subject{SUBJECT_NUM:04d}")
+# One folder per BVH (and variant), so frames of different walks never skip or overwrite each other
+RENDER_OUTPUT_DIR = os.path.join(WORKSPACE_DIR, "renders", f"subject{SUBJECT_NUM:04d}", f"{BVH_NAME}_auto")
+RENDER_STAGING_DIR = None  # Optional RAM disk folder (e.g. r"R:\gait_staging" or "/dev/shm/gait") to render into first
+RENDER_FLUSH_WORKERS = 8  # Parallel file moves from RENDER_STAGING_DIR to RENDER_OUTPUT_DIR
+PROFILE_DIR = None  # Set (e.g. os.path.join(WORKSPACE_DIR, "profiles")) to dump a cProfile of each run
 RENDER_IMAGE_FORMAT = 'PNG'      # 'PNG', 'JPEG', etc.
 RENDER_RESOLUTION_X = 320       # Width in pixels
 RENDER_RESOLUTION_Y = 240       # Height in pixels
+RENDER_RESOLUTION_PERCENTAGE = 100  # Full resolution for final renders, lower (e.g. 50) for quick previews
+RENDER_AA = 'FXAA'  # Workbench anti-aliasing: 'FXAA' is a single post-process pass, 'OFF' disables it
 RENDER_FRAME_START = 2           # Start frame
 RENDER_FRAME_END = 75           # End frame
-RENDER_BATCH_SIZE = 10  # Reduced from 50 to 10
 RENDER_ENGINE = 'BLENDER_WORKBENCH'  # Use 'BLENDER_WORKBENCH' for simpler rendering
-RENDER_SAMPLES = 16  # Lower sample count for Eevee
+RENDER_SAMPLES = 8  # Lower sample count for Eevee
+CYCLES_SAMPLES = 32  # Sample count when RENDER_ENGINE = 'CYCLES' (adaptive sampling enabled)
+CYCLES_DEVICE_TYPES = ('OPTIX', 'CUDA')  # GPU backends to try for Cycles, in order
+RENDER_MULTIVIEW = True  # Render all cameras in one multiview pass instead of one render per camera
+
+# --------------------------
+# BAKED SCENE
+# --------------------------
+USE_ALEMBIC_CACHE = True  # Bake the retargeted animation to ALEMBIC_FILE instead of skinning every render
+# Settings baked into the scene that are too long for the name: a checksum of HIDDEN_SUBJECT_PARTS
+# and of the linked CAMERA_RIG_BLEND, whose name changes with the rig parameters
+BAKE_SETTINGS_KEY = zlib.crc32(",".join(sorted(HIDDEN_SUBJECT_PARTS) + [os.path.basename(CAMERA_RIG_BLEND)]).encode())
+# Baked scene (subject + retargeted BVH + cameras), reused while newer than the subject, BVH and rig files;
+# the name encodes the frame range, Alembic cache and BAKE_SETTINGS_KEY so changing them bakes a new one
+BAKED_BLEND = os.path.join(
+    WORKSPACE_DIR, "baked",
+    f"subject{SUBJECT_NUM:04d}_{BVH_NAME}_auto_f{RENDER_FRAME_START}-{RENDER_FRAME_END}"
+    f"{'_abc' if USE_ALEMBIC_CACHE else ''}_{BAKE_SETTINGS_KEY:08x}.blend"
+)
+ALEMBIC_FILE = os.path.splitext(BAKED_BLEND)[0] + ".abc"  # Pre-skinned subject meshes
 
 # --------------------------
 # UTILITIES
 # --------------------------
+@contextmanager
+def timed_phase(name):
+    """Print the wall time spent in a pipeline phase."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        print(f"[TIME] {name}: {time.perf_counter() - start:.2f} s")
+
+@contextmanager
+def global_undo_disabled():
+    """Turn off undo tracking, which only slows down scripted operators, and restore the user's preference after."""
+    edit_prefs = bpy.context.preferences.edit
+    use_global_undo = edit_prefs.use_global_undo
+    edit_prefs.use_global_undo = False
+    try:
+        yield
+    finally:
+        edit_prefs.use_global_undo = use_global_undo
+
 def clean_scene():
-    """Remove everything from the current Blender scene."""
-    bpy.ops.object.select_all(action="SELECT")
-    bpy.ops.object.delete(use_global=False)
+    """
+    Remove all objects and their data (meshes, armatures, cameras, materials, images) from the file,
+    plus the Alembic caches and linked libraries (camera rig) a baked scene refers to.
+    """
+    bpy.context.scene.render.use_persistent_data = False  # Drop render data cached for the old scene
+    for datablocks in (bpy.data.objects, bpy.data.meshes, bpy.data.armatures,
+                       bpy.data.cameras, bpy.data.materials, bpy.data.images):
+        for item in list(datablocks):
+            datablocks.remove(item, do_unlink=True)
+    # Cache files have no remove() of their own, so these go through batch_remove
+    bpy.data.batch_remove(list(bpy.data.cache_files) + list(bpy.data.libraries))
+    bpy.context.scene.render.use_persistent_data = True
     print("[INFO] Scene cleaned.")
 
+def setup_plain_background():
+    """Replace the default world with a plain black one, so no sky or ambient light is shaded."""
+    world = bpy.data.worlds.get("Plain") or bpy.data.worlds.new("Plain")
+    world.use_nodes = False
+    world.color = (0, 0, 0)
+    bpy.context.scene.world = world
+    print("[INFO] Plain background set.")
+
 def import_subject(filepath):
     """Import a MakeHuman .mhm subject via MPFB."""
     if not os.path.exists(filepath):
@@ -58,6 +141,19 @@ def import_subject(filepath):
     print(f"[INFO] Imported subject: {subject.name}")
     return subject
 
+def hide_invisible_subject_parts(subject):
+    """
+    Exclude subject parts listed in HIDDEN_SUBJECT_PARTS from rendering; they add geometry
+    but nothing to a 320x240 gait silhouette. Parts are matched by MPFB object type or name.
+    """
+    hidden = []
+    for obj in subject.children_recursive:
+        object_type = obj.get("MPFB_GEN_object_type", "")
+        if object_type in HIDDEN_SUBJECT_PARTS or any(part.lower() in obj.name.lower() for part in HIDDEN_SUBJECT_PARTS):
+            obj.hide_render = True
+            hidden.append(obj.name)
+    print(f"[INFO] Hidden from render: {', '.join(hidden) if hidden else 'nothing'}")
+
 def import_and_retarget_bvh(filepath, target):
     """Import BVH and retarget it onto the given MakeHuman armature."""
     if not os.path.exists(filepath):
@@ -83,30 +179,70 @@ def import_and_retarget_bvh(filepath, target):
 
     print(f"[INFO] BVH loaded and retargeted: {filepath}")
 
+def get_abc_name(name):
+    """Name Blender's Alembic exporter writes for an object or mesh (spaces, dots and colons become '_')."""
+    return re.sub(r"[ .:]", "_", name)
+
+def bake_subject_to_alembic(subject):
+    """
+    Export the animated subject meshes to ALEMBIC_FILE and drive them from a MeshSequenceCache
+    instead of the armature, so skinning is evaluated once per frame here rather than per camera render.
+    """
+    meshes = [obj for obj in subject.children_recursive if obj.type == 'MESH' and not obj.hide_render]
+    if not meshes:
+        print("[WARNING] No subject meshes found, skipping Alembic bake.")
+        return
+
+    for obj in bpy.context.view_layer.objects:
+        obj.select_set(obj in meshes)
+    os.makedirs(os.path.dirname(ALEMBIC_FILE), exist_ok=True)
+    bpy.ops.wm.alembic_export(
+        filepath=ALEMBIC_FILE,
+        start=RENDER_FRAME_START,
+        end=RENDER_FRAME_END,
+        selected=True,
+        flatten=True,
+        apply_subdiv=True
+    )
+
+    # bpy.data.cache_files has no load(); the operator adds the CacheFile, which is then found by its path
+    bpy.ops.cachefile.open(filepath=ALEMBIC_FILE, relative_path=False)
+    cache_file = [cf for cf in bpy.data.cache_files
+                  if os.path.normpath(bpy.path.abspath(cf.filepath)) == os.path.normpath(ALEMBIC_FILE)][-1]
+    for obj in meshes:
+        # The cache already contains the full modifier stack, so unparent and replace it
+        matrix = obj.matrix_world.copy()
+        obj.parent = None
+        obj.matrix_world = matrix
+        obj.modifiers.clear()
+        cache = obj.modifiers.new(name="GaitCache", type='MESH_SEQUENCE_CACHE')
+        cache.cache_file = cache_file
+        cache.object_path = f"/{get_abc_name(obj.name)}/{get_abc_name(obj.data.name)}"
+
+    print(f"[INFO] Subject baked to Alembic: {ALEMBIC_FILE} ({len(meshes)} meshes)")
+
 def setup_cameras(subject_location=(0, 0, 0)):
     """
     Add cameras in a semicircle around the camera array center at specified height.
     Each camera points to the subject's origin (empty).
     """
-    import math
-
     # Create an empty at the subject's origin for camera tracking
     empty_name = "CameraTarget"
     empty_location = (0, 0, EMPTY_HEIGHT)
-    bpy.ops.object.empty_add(type='PLAIN_AXES', location=empty_location)
-    target_empty = bpy.context.active_object
-    target_empty.name = empty_name
+    target_empty = bpy.data.objects.new(empty_name, None)
+    target_empty.empty_display_type = 'PLAIN_AXES'
+    target_empty.location = empty_location
+    bpy.context.collection.objects.link(target_empty)
 
-    angles_deg = [i * CAMERA_ANGLE_STEP for i in range(CAMERA_COUNT)]  # e.g. 0°, 18°, ..., 180°
-    for angle in angles_deg:
-        angle_rad = math.radians(angle - 90)  # Offset by +90° so 0° is in front (positive Y axis)
-        x = 0 + CAMERA_RADIUS * math.cos(angle_rad)  # Cameras centered at (0, 0)
-        y = 0 + CAMERA_RADIUS * math.sin(angle_rad)
-        z = CAMERA_HEIGHT
+    for i in range(CAMERA_COUNT):
+        angle = int(CAMERA_ANGLES_DEG[i])
+        x, y, z = float(CAMERA_X[i]), float(CAMERA_Y[i]), CAMERA_HEIGHT
 
-        bpy.ops.object.camera_add(location=(x, y, z))
-        cam = bpy.context.active_object
-        cam.name = f"Camera_{angle:03d}"
+        # Data API instead of bpy.ops: no context lookup, undo push or per-call depsgraph update
+        cam_data = bpy.data.cameras.new(name=f"Camera_{angle:03d}")
+        cam = bpy.data.objects.new(cam_data.name, cam_data)
+        cam.location = (x, y, z)
+        bpy.context.collection.objects.link(cam)
 
         # Add Track To constraint
         constraint = cam.constraints.new(type='TRACK_TO')
@@ -116,56 +252,285 @@ def setup_cameras(subject_location=(0, 0, 0)):
 
         print(f"[INFO] Added camera at {angle}°: {cam.name}")
 
+def get_camera_rig_objects():
+    """Return the CameraTarget empty and Camera_XXX objects of the current file."""
+    return [obj for obj in bpy.data.objects if obj.name == "CameraTarget" or obj.name.startswith("Camera_")]
+
+def load_camera_rig(subject_location=(0, 0, 0)):
+    """
+    Link the camera rig (CameraTarget + cameras) from CAMERA_RIG_BLEND into the scene.
+    The first run builds it with setup_cameras() and writes it to CAMERA_RIG_BLEND;
+    later subjects and BVHs only link it instead of rebuilding the cameras.
+    """
+    if not os.path.exists(CAMERA_RIG_BLEND):
+        setup_cameras(subject_location=subject_location)
+        os.makedirs(os.path.dirname(CAMERA_RIG_BLEND), exist_ok=True)
+        bpy.data.libraries.write(CAMERA_RIG_BLEND, set(get_camera_rig_objects()), fake_user=True)
+        print(f"[INFO] Camera rig saved: {CAMERA_RIG_BLEND}")
+        return
+
+    with bpy.data.libraries.load(CAMERA_RIG_BLEND, link=True) as (data_from, data_to):
+        data_to.objects = [name for name in data_from.objects if name == "CameraTarget" or name.startswith("Camera_")]
+    for obj in data_to.objects:
+        bpy.context.collection.objects.link(obj)
+    print(f"[INFO] Camera rig linked from {CAMERA_RIG_BLEND}: {len(data_to.objects)} objects")
+
+def enable_cycles_gpu(scene):
+    """Render Cycles on every available GPU, trying CYCLES_DEVICE_TYPES in order (OptiX, then CUDA)."""
+    prefs = bpy.context.preferences.addons['cycles'].preferences
+    for device_type in CYCLES_DEVICE_TYPES:
+        try:
+            prefs.compute_device_type = device_type
+        except TypeError:
+            continue  # Backend not supported by this Blender build
+        prefs.get_devices()
+        devices = [d for d in prefs.devices if d.type == device_type]
+        if devices:
+            for device in devices:
+                device.use = True
+            scene.cycles.device = 'GPU'
+            print(f"[INFO] Cycles rendering on {device_type}: {', '.join(d.name for d in devices)}")
+            return
+    scene.cycles.device = 'CPU'
+    print("[WARNING] No GPU found for Cycles, rendering on CPU.")
+
+def get_render_threads():
+    """
+    Fixed thread count when several Blender processes render at once (NUM_CONCURRENT_BLENDERS,
+    set by blender_batch_controller), so they share the CPU instead of oversubscribing it.
+    Returns None when this is the only process, leaving Blender on automatic threads.
+    """
+    concurrent = int(os.environ.get("NUM_CONCURRENT_BLENDERS", "1"))
+    if concurrent <= 1:
+        return None
+    return max(1, min(4, ((os.cpu_count() or 2) - 1) // concurrent))
+
+def configure_rendering(scene, threads=None):
+    """
+    Apply the RENDER CONFIGURATION settings to the given scene.
+    CPU render threads are fixed to threads if given, else to get_render_threads().
+    """
+    scene.render.image_settings.file_format = RENDER_IMAGE_FORMAT
+    scene.render.resolution_x = RENDER_RESOLUTION_X
+    scene.render.resolution_y = RENDER_RESOLUTION_Y
+    scene.render.resolution_percentage = RENDER_RESOLUTION_PERCENTAGE
+    scene.render.engine = RENDER_ENGINE
+    scene.render.use_persistent_data = True  # Keep scene data resident between camera renders
+    scene.render.use_high_quality_normals = False
+
+    threads = threads or get_render_threads()
+    if threads:
+        scene.render.threads_mode = 'FIXED'
+        scene.render.threads = threads
+    else:
+        scene.render.threads_mode = 'AUTO'
+
+    if RENDER_ENGINE == 'BLENDER_WORKBENCH':
+        scene.display.shading.show_cavity = False
+        scene.display.shading.show_shadows = False
+        scene.display.shading.light = 'FLAT'
+        scene.display.shading.color_type = 'MATERIAL'
+        scene.display.render_aa = RENDER_AA
+    elif RENDER_ENGINE == 'BLENDER_EEVEE':
+        scene.eevee.taa_render_samples = RENDER_SAMPLES
+        scene.eevee.use_gtao = False
+        scene.eevee.use_bloom = False
+        scene.eevee.use_ssr = False
+    elif RENDER_ENGINE == 'CYCLES':
+        enable_cycles_gpu(scene)
+        scene.cycles.samples = CYCLES_SAMPLES
+        scene.cycles.use_adaptive_sampling = True
+        scene.render.film_transparent = True  # Only the subject is shaded, background stays empty
+
+    scene.frame_start = RENDER_FRAME_START
+    scene.frame_end = RENDER_FRAME_END
+
+    # Skip frames already on disk so an interrupted render resumes where it stopped. No placeholders:
+    # a crash would leave 0-byte frames behind that look rendered (see remove_empty_frames)
+    scene.render.use_overwrite = False
+    scene.render.use_placeholder = False
+
+def render_animation(label):
+    """
+    Render the scene frame range through the active camera (or views). Workbench uses the
+    viewport (OpenGL) render, which skips the compositor and view-layer passes of the full pipeline.
+    The viewport render needs a window, so background (--background) runs use the regular renderer.
+    """
+    with timed_phase(f"Render {label}"):
+        if RENDER_ENGINE == 'BLENDER_WORKBENCH' and not bpy.app.background:
+            bpy.ops.render.opengl(animation=True, view_context=False, write_still=True)
+        else:
+            bpy.ops.render.render(animation=True, write_still=True)
+
+def remove_empty_frames(cam_name):
+    """Delete 0-byte frames (e.g. placeholders of a crashed render) from the camera's RENDER_OUTPUT_DIR folder."""
+    cam_dir = os.path.join(RENDER_OUTPUT_DIR, cam_name)
+    if not os.path.isdir(cam_dir):
+        return
+    for name in os.listdir(cam_dir):
+        path = os.path.join(cam_dir, name)
+        if os.path.isfile(path) and os.path.getsize(path) == 0:
+            os.remove(path)
+
+def get_first_missing_frame(cam_name):
+    """
+    Return the first frame the camera still needs, or None if all its frames are in RENDER_OUTPUT_DIR.
+    Checked against the final folder, so resuming also works when rendering into staging or multiview folders.
+    """
+    remove_empty_frames(cam_name)
+    ext = bpy.context.scene.render.file_extension
+    cam_dir = os.path.join(RENDER_OUTPUT_DIR, cam_name)
+    for frame in range(RENDER_FRAME_START, RENDER_FRAME_END + 1):
+        if not os.path.exists(os.path.join(cam_dir, f"frame_{frame:04d}{ext}")):
+            return frame
+    return None
+
+def get_staging_prefix():
+    """Name shared by the staging folders of this subject and RENDER_OUTPUT_DIR; each process appends its pid."""
+    return f"subject{SUBJECT_NUM:04d}_{os.path.basename(RENDER_OUTPUT_DIR)}_"
+
+def get_render_dir():
+    """Directory Blender writes frames to: the staging RAM disk if configured, else RENDER_OUTPUT_DIR."""
+    if RENDER_STAGING_DIR:
+        # One folder per process, so concurrent batches never flush each other's unfinished frames
+        return os.path.join(RENDER_STAGING_DIR, f"{get_staging_prefix()}{os.getpid()}")
+    return RENDER_OUTPUT_DIR
+
+def flush_staged_frames(staging_dir=None):
+    """
+    Move frames from a staging folder (this process's by default) into RENDER_OUTPUT_DIR,
+    several files at a time, then remove the emptied folder. Frames a failed multiview pass
+    left unsplit go to their camera's folder, so the multiview folder never reaches the dataset.
+    """
+    if not RENDER_STAGING_DIR:
+        return
+    staging_dir = staging_dir or get_render_dir()
+    moves = []
+    for dirpath, _, filenames in os.walk(staging_dir):
+        rel_dir = os.path.relpath(dirpath, staging_dir)
+        for name in filenames:
+            if rel_dir == "multiview":
+                # frame_0002_018.png -> Camera_018/frame_0002.png, anything else is dropped with the folder
+                match = re.fullmatch(r"(frame_\d+)(_\d+)(\.\w+)", name)
+                if not match:
+                    continue
+                dest = os.path.join(RENDER_OUTPUT_DIR, f"Camera{match.group(2)}", match.group(1) + match.group(3))
+            else:
+                dest = os.path.join(RENDER_OUTPUT_DIR, rel_dir, name)
+            moves.append((os.path.join(dirpath, name), dest))
+    for dest_dir in {os.path.dirname(dest) for _, dest in moves}:
+        os.makedirs(dest_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=RENDER_FLUSH_WORKERS) as pool:
+        list(pool.map(lambda move: shutil.move(*move), moves))
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    print(f"[INFO] Moved {len(moves)} frames from {staging_dir} to {RENDER_OUTPUT_DIR}")
+
+def flush_leftover_staging():
+    """
+    Move frames that interrupted runs left in RENDER_STAGING_DIR into RENDER_OUTPUT_DIR, so resuming counts them.
+    Skipped while several Blender processes render at once, since their staging folders may still be in use.
+    """
+    if not RENDER_STAGING_DIR or not os.path.isdir(RENDER_STAGING_DIR):
+        return
+    if int(os.environ.get("NUM_CONCURRENT_BLENDERS", "1")) > 1:
+        return
+    for name in os.listdir(RENDER_STAGING_DIR):
+        if name.startswith(get_staging_prefix()):
+            flush_staged_frames(os.path.join(RENDER_STAGING_DIR, name))
+
+def split_multiview_output(cameras, multiview_dir):
+    """Move multiview frames (frame_0002_018.png) into per-camera folders (Camera_018/frame_0002.png)."""
+    ext = bpy.context.scene.render.file_extension
+    for cam in cameras:
+        suffix = cam.name[len("Camera"):]
+        cam_output_dir = os.path.join(get_render_dir(), cam.name)
+        os.makedirs(cam_output_dir, exist_ok=True)
+        for frame in range(RENDER_FRAME_START, RENDER_FRAME_END + 1):
+            src = os.path.join(multiview_dir, f"frame_{frame:04d}{suffix}{ext}")
+            if os.path.exists(src):
+                os.replace(src, os.path.join(cam_output_dir, f"frame_{frame:04d}{ext}"))
+
+def render_cameras_multiview(cameras):
+    """
+    Render the given cameras in a single animation pass, one multiview view per camera,
+    so each frame's animation and scene evaluation is shared by all cameras.
+    Frames end up in the same per-camera folders as a per-camera render.
+    Returns the names of the cameras that failed to render.
+    """
+    scene = bpy.context.scene
+    first_frames = {cam.name: get_first_missing_frame(cam.name) for cam in cameras}
+    cameras = [cam for cam in cameras if first_frames[cam.name] is not None]
+    if not cameras:
+        print("[INFO] All cameras already rendered, skipping.")
+        return []
+    scene.frame_start = min(first_frames[cam.name] for cam in cameras)
+    scene.render.use_multiview = True
+    scene.render.views_format = 'MULTIVIEW'
+    for view in scene.render.views:
+        view.use = False
+    for cam in cameras:
+        # A view renders through the camera named <prefix><suffix>, e.g. "Camera" + "_018"
+        view = scene.render.views.get(cam.name) or scene.render.views.new(cam.name)
+        view.camera_suffix = cam.name[len("Camera"):]
+        view.use = True
+    scene.camera = cameras[0]
+    scene.render.image_settings.views_format = 'INDIVIDUAL'
+
+    multiview_dir = os.path.join(get_render_dir(), "multiview")
+    os.makedirs(multiview_dir, exist_ok=True)
+    scene.render.filepath = os.path.join(multiview_dir, "frame_")
+
+    print(f"[RENDER] {', '.join(cam.name for cam in cameras)}: frames {scene.frame_start}-{RENDER_FRAME_END}")
+    try:
+        render_animation(f"{len(cameras)} cameras (multiview)")
+    except Exception as e:
+        print(f"[ERROR] Multiview rendering failed: {str(e)}")
+        return [cam.name for cam in cameras]
+    finally:
+        # Also after a failure, so the frames written so far count when resuming
+        split_multiview_output(cameras, multiview_dir)
+        if not os.listdir(multiview_dir):
+            os.rmdir(multiview_dir)
+    return []
+
 def render_all_cameras():
     """
     Loop through all cameras and render animation frames for each.
     Each camera's frames are saved in its own folder.
     Pauses after every 4 cameras for user input to avoid Blender crashing.
     """
-    # Set render settings
-    bpy.context.scene.render.image_settings.file_format = RENDER_IMAGE_FORMAT
-    bpy.context.scene.render.resolution_x = RENDER_RESOLUTION_X
-    bpy.context.scene.render.resolution_y = RENDER_RESOLUTION_Y
-    
-    # Use simpler render engine
-    bpy.context.scene.render.engine = RENDER_ENGINE
-    
-    # If using Eevee, lower the sample count
-    if RENDER_ENGINE == 'BLENDER_EEVEE':
-        bpy.context.scene.eevee.taa_render_samples = RENDER_SAMPLES
-        bpy.context.scene.eevee.use_gtao = False
-        bpy.context.scene.eevee.use_bloom = False
-        bpy.context.scene.eevee.use_ssr = False
-        
-    # Set frame range for rendering
-    bpy.context.scene.frame_start = RENDER_FRAME_START
-    bpy.context.scene.frame_end = RENDER_FRAME_END
+    configure_rendering(bpy.context.scene)
 
     cameras = [obj for obj in bpy.data.objects if obj.type == 'CAMERA' and obj.name.startswith("Camera_")]
     if not cameras:
-        print("[ERROR] No cameras found for rendering.")
-        return
+        raise RuntimeError("No cameras found for rendering.")
 
+    failed = []
     for idx, cam in enumerate(cameras, start=1):
+        first_frame = get_first_missing_frame(cam.name)
+        if first_frame is None:
+            print(f"[INFO] {cam.name} already rendered, skipping.")
+            continue
+        bpy.context.scene.frame_start = first_frame
         bpy.context.scene.camera = cam
-        cam_output_dir = os.path.join(RENDER_OUTPUT_DIR, cam.name)
+        cam_output_dir = os.path.join(get_render_dir(), cam.name)
         os.makedirs(cam_output_dir, exist_ok=True)
         bpy.context.scene.render.filepath = os.path.join(cam_output_dir, "frame_")
 
-        for batch_start in range(RENDER_FRAME_START, RENDER_FRAME_END + 1, RENDER_BATCH_SIZE):
-            batch_end = min(batch_start + RENDER_BATCH_SIZE - 1, RENDER_FRAME_END)
-            bpy.context.scene.frame_start = batch_start
-            bpy.context.scene.frame_end = batch_end
-            print(f"[RENDER] {cam.name}: frames {batch_start}-{batch_end}")
-            try:
-                bpy.ops.render.render(animation=True, write_still=True)
-            except Exception as e:
-                print(f"[ERROR] Rendering failed for camera {cam.name}, frames {batch_start}-{batch_end}: {str(e)}")
+        print(f"[RENDER] {cam.name}: frames {first_frame}-{RENDER_FRAME_END}")
+        try:
+            render_animation(cam.name)
+        except Exception as e:
+            print(f"[ERROR] Rendering failed for camera {cam.name}: {str(e)}")
+            failed.append(cam.name)
 
         # Pause after every 4 cameras
         if idx % 4 == 0 and idx < len(cameras):
             input(f"\n[PAUSE] {idx} cameras rendered. Press Enter to continue to the next batch...")
 
+    flush_staged_frames()
+    if failed:
+        raise RuntimeError(f"Rendering failed for cameras: {', '.join(failed)}")
     print("[RENDER] All cameras rendered.")
 
 def render_cameras_in_range(start_idx=0, end_idx=3):
@@ -173,63 +538,126 @@ def render_cameras_in_range(start_idx=0, end_idx=3):
     Render cameras in the specified index range [start_idx, end_idx] (inclusive).
     Each camera's frames are saved in its own folder.
     """
-    bpy.context.scene.render.image_settings.file_format = RENDER_IMAGE_FORMAT
-    bpy.context.scene.render.resolution_x = RENDER_RESOLUTION_X
-    bpy.context.scene.render.resolution_y = RENDER_RESOLUTION_Y
-    bpy.context.scene.render.engine = RENDER_ENGINE
-
-    if RENDER_ENGINE == 'BLENDER_EEVEE':
-        bpy.context.scene.eevee.taa_render_samples = RENDER_SAMPLES
-        bpy.context.scene.eevee.use_gtao = False
-        bpy.context.scene.eevee.use_bloom = False
-        bpy.context.scene.eevee.use_ssr = False
-
-    bpy.context.scene.frame_start = RENDER_FRAME_START
-    bpy.context.scene.frame_end = RENDER_FRAME_END
+    configure_rendering(bpy.context.scene)
 
     cameras = [obj for obj in bpy.data.objects if obj.type == 'CAMERA' and obj.name.startswith("Camera_")]
     if not cameras:
-        print("[ERROR] No cameras found for rendering.")
-        return
+        raise RuntimeError("No cameras found for rendering.")
 
     # Clamp indices to valid range
     start_idx = max(0, start_idx)
     end_idx = min(len(cameras) - 1, end_idx)
 
-    for idx in range(start_idx, end_idx + 1):
-        cam = cameras[idx]
-        bpy.context.scene.camera = cam
-        cam_output_dir = os.path.join(RENDER_OUTPUT_DIR, cam.name)
-        os.makedirs(cam_output_dir, exist_ok=True)
-        bpy.context.scene.render.filepath = os.path.join(cam_output_dir, "frame_")
-
-        for batch_start in range(RENDER_FRAME_START, RENDER_FRAME_END + 1, RENDER_BATCH_SIZE):
-            batch_end = min(batch_start + RENDER_BATCH_SIZE - 1, RENDER_FRAME_END)
-            bpy.context.scene.frame_start = batch_start
-            bpy.context.scene.frame_end = batch_end
-            print(f"[RENDER] {cam.name}: frames {batch_start}-{batch_end}")
+    failed = []
+    if RENDER_MULTIVIEW:
+        failed = render_cameras_multiview(cameras[start_idx:end_idx + 1])
+    else:
+        for idx in range(start_idx, end_idx + 1):
+            cam = cameras[idx]
+            first_frame = get_first_missing_frame(cam.name)
+            if first_frame is None:
+                print(f"[INFO] {cam.name} already rendered, skipping.")
+                continue
+            bpy.context.scene.frame_start = first_frame
+            bpy.context.scene.camera = cam
+            cam_output_dir = os.path.join(get_render_dir(), cam.name)
+            os.makedirs(cam_output_dir, exist_ok=True)
+            bpy.context.scene.render.filepath = os.path.join(cam_output_dir, "frame_")
+
+            print(f"[RENDER] {cam.name}: frames {first_frame}-{RENDER_FRAME_END}")
             try:
-                bpy.ops.render.render(animation=True, write_still=True)
+                render_animation(cam.name)
             except Exception as e:
-                print(f"[ERROR] Rendering failed for camera {cam.name}, frames {batch_start}-{batch_end}: {str(e)}")
+                print(f"[ERROR] Rendering failed for camera {cam.name}: {str(e)}")
+                failed.append(cam.name)
 
+    flush_staged_frames()
+    if failed:
+        raise RuntimeError(f"Rendering failed for cameras: {', '.join(failed)}")
     print(f"[RENDER] Cameras {start_idx + 1} to {end_idx + 1} rendered.")
 
-# --------------------------
-# MAIN PIPELINE (DEBUG)
-# --------------------------
-def main():
+def is_baked_blend_current():
+    """
+    Return True if BAKED_BLEND (and its ALEMBIC_FILE, when used) exists and is newer than
+    the subject, BVH and camera rig it was built from. The rig must exist, since the baked scene links its cameras.
+    """
+    if not os.path.exists(BAKED_BLEND) or not os.path.exists(CAMERA_RIG_BLEND):
+        return False
+    if USE_ALEMBIC_CACHE and not os.path.exists(ALEMBIC_FILE):
+        return False
+    baked_mtime = os.path.getmtime(BAKED_BLEND)
+    if os.path.getmtime(CAMERA_RIG_BLEND) > baked_mtime:
+        return False
+    return all(os.path.getmtime(path) < baked_mtime for path in (SUBJECT_FILE, BVH_FILE) if os.path.exists(path))
+
+def is_baked_blend_loaded():
+    """Return True if Blender was started on an up-to-date BAKED_BLEND that links the current CAMERA_RIG_BLEND."""
+    if not bpy.data.filepath:
+        return False
+    loaded = os.path.normcase(os.path.abspath(bpy.data.filepath))
+    if loaded != os.path.normcase(os.path.abspath(BAKED_BLEND)) or not is_baked_blend_current():
+        return False
+    rig = os.path.normcase(os.path.abspath(CAMERA_RIG_BLEND))
+    return all(os.path.normcase(os.path.abspath(bpy.path.abspath(lib.filepath))) == rig for lib in bpy.data.libraries)
+
+def prepare_baked_blend():
+    """
+    Build the scene (subject, retargeted BVH, cameras) and save it to BAKED_BLEND,
+    so later runs can open the baked file instead of re-importing.
+    Returns the imported subject.
+    """
     clean_scene()
+    setup_plain_background()
     print("[STEP] Importing subject…")
     subject_location = (0, -SUBJECT_START_OFFSET, 0)
-    subject = import_subject(SUBJECT_FILE)
+    with timed_phase("Import subject"):
+        subject = import_subject(SUBJECT_FILE)
     subject.location = subject_location
+    hide_invisible_subject_parts(subject)
 
     print("[STEP] Importing + Retargeting BVH…")
-    import_and_retarget_bvh(BVH_FILE, subject)
+    with timed_phase("Import + retarget BVH"):
+        import_and_retarget_bvh(BVH_FILE, subject)
+
+    if USE_ALEMBIC_CACHE:
+        print("[STEP] Baking subject animation to Alembic…")
+        with timed_phase("Alembic bake"):
+            bake_subject_to_alembic(subject)
 
     print("[STEP] Setting up cameras…")
-    setup_cameras(subject_location=subject_location)
+    with timed_phase("Camera rig"):
+        load_camera_rig(subject_location=subject_location)
+
+    # Remember the subject so a run on the baked file can find it again
+    bpy.context.scene["gait_subject"] = subject.name
+    os.makedirs(os.path.dirname(BAKED_BLEND), exist_ok=True)
+    bpy.ops.wm.save_as_mainfile(filepath=BAKED_BLEND)
+    print(f"[INFO] Baked scene saved: {BAKED_BLEND}")
+    return subject
+
+def run_profiled(func):
+    """Run func under cProfile and dump cumulative stats to PROFILE_DIR (one file per process)."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        func()
+    finally:
+        profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profile_path = os.path.join(PROFILE_DIR, f"gait_profile_{os.getpid()}.prof")
+        pstats.Stats(profiler).sort_stats('cumulative').dump_stats(profile_path)
+        print(f"[INFO] Profile saved: {profile_path}")
+
+# --------------------------
+# MAIN PIPELINE (DEBUG)
+# --------------------------
+def main():
+    flush_leftover_staging()
+    if is_baked_blend_loaded():
+        print(f"[STEP] Using baked scene: {BAKED_BLEND}")
+        subject = bpy.data.objects[bpy.context.scene["gait_subject"]]
+    else:
+        subject = prepare_baked_blend()
 
     print("[STEP] Rendering animation from selected cameras…")
     render_cameras_in_range(start_idx=8, end_idx=10)
@@ -237,4 +665,8 @@ def main():
     print(f"[DONE] Subject with animation and cameras in scene: {subject.name}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with global_undo_disabled():
+        if PROFILE_DIR:
+            run_profiled(main)
+        else:
+            main()
@@ -1,40 +1,151 @@
+import multiprocessing
+import os
 import subprocess
 import sys
-import time
 
 # --- CONFIGURATION ---
 BLENDER_EXE = r"C:\Program Files\Blender Foundation\Blender 4.5\blender.exe"  # Update if needed
 BLENDER_SCRIPT = r"d:\Gait Project\Master\workspace\Manual_Automation.py"     # Your automation script
 BLEND_FILE = r"d:\Gait Project\Master\workspace\Master.blend"                 # Your .blend file (optional)
-CAMERA_BATCHES = [
-    (0, 3),   # First batch: cameras 0-3
-    (4, 7),   # Second batch: cameras 4-7
-    (8, 10),  # Third batch: cameras 8-10
-]
-# Add more batches as needed
-
-def run_blender_batch(start_idx, end_idx):
-    print(f"\n[INFO] Starting Blender batch for cameras {start_idx} to {end_idx}...")
+CAMERA_COUNT = 11          # Cameras in the rig (Camera_000 ... Camera_180)
+CAMERAS_PER_TASK = None    # Cameras per Blender invocation (rendered in one multiview pass), None = split evenly over the workers
+TASKS_PER_WORKER = 4       # Recycle a pool worker after this many tasks
+NUM_GPUS = 1               # Workers run concurrently, each pinned to a free GPU via CUDA_VISIBLE_DEVICES
+THREADS_PER_BLENDER = None  # CPU-only (Workbench) renders: threads per Blender process, None = Blender default
+
+# Per-worker state set by init_worker(): baked scene, queue of free GPU indices and the pool size
+worker_blend_file = None
+worker_free_gpus = None
+worker_num_concurrent = 1
+
+def bake_scene():
+    """
+    Run the script once with --bake_only, so it builds its baked scene (or confirms it is current)
+    before any render starts and render workers never rebuild it concurrently.
+    Returns the baked .blend path reported by the script, or None if baking failed.
+    """
+    print("\n[INFO] Baking scene...")
     cmd = [
         BLENDER_EXE,
         "--background",
         BLEND_FILE,
+        "--python-exit-code", "1",
+        "--python", BLENDER_SCRIPT,
+        "--",
+        "--bake_only"
+    ]
+    env = os.environ.copy()
+    env["PYTHONIOENCODING"] = "utf-8"
+    baked_blend = None
+    # Echo each line as it arrives, since importing, retargeting and exporting the subject can take minutes
+    with subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE, encoding="utf-8", errors="replace") as process:
+        for line in process.stdout:
+            print(line, end="", flush=True)
+            if line.startswith("[BAKED] "):
+                baked_blend = line[len("[BAKED] "):].strip()
+    if process.returncode != 0:
+        print(f"[ERROR] Baking failed with code {process.returncode}.")
+        return None
+    if baked_blend is None:
+        print("[ERROR] Script did not report a baked scene.")
+    return baked_blend
+
+def run_blender_batch(start_idx, end_idx, blend_file, gpu_idx=None, threads=None, num_concurrent=1):
+    """Launch a Blender process for cameras [start_idx, end_idx] and return its handle without waiting."""
+    print(f"\n[INFO] Starting Blender batch for cameras {start_idx} to {end_idx}...")
+    cmd = [
+        BLENDER_EXE,
+        "--background",
+        blend_file,
+        "--python-exit-code", "1",
         "--python", BLENDER_SCRIPT,
         "--",
         f"--start_idx={start_idx}",
         f"--end_idx={end_idx}"
     ]
-    result = subprocess.run(cmd)
-    if result.returncode == 0:
+    if gpu_idx is not None:
+        cmd.append(f"--gpu={gpu_idx}")
+    if threads is not None:
+        cmd.append(f"--threads={threads}")
+    env = os.environ.copy()
+    env["NUM_CONCURRENT_BLENDERS"] = str(num_concurrent)  # Lets the script size its render thread pool
+    if gpu_idx is not None:
+        env["CUDA_VISIBLE_DEVICES"] = str(gpu_idx)
+        print(f"[INFO] Batch {start_idx}-{end_idx} pinned to GPU {gpu_idx}.")
+    return subprocess.Popen(cmd, env=env)
+
+def wait_for_batch(start_idx, end_idx, process):
+    returncode = process.wait()
+    if returncode == 0:
         print(f"[INFO] Batch {start_idx}-{end_idx} completed successfully.")
     else:
-        print(f"[ERROR] Batch {start_idx}-{end_idx} failed with code {result.returncode}.")
+        print(f"[ERROR] Batch {start_idx}-{end_idx} failed with code {returncode}.")
+    return returncode
+
+def get_camera_tasks(max_concurrent):
+    """
+    Split the rig into (start_idx, end_idx) tasks of contiguous cameras: CAMERAS_PER_TASK each, or by default
+    ceil(CAMERA_COUNT / max_concurrent), so every Blender shares each frame's evaluation across several views.
+    """
+    cameras_per_task = CAMERAS_PER_TASK or -(-CAMERA_COUNT // max_concurrent)
+    return [(start_idx, min(start_idx + cameras_per_task, CAMERA_COUNT) - 1)
+            for start_idx in range(0, CAMERA_COUNT, cameras_per_task)]
+
+def get_max_concurrent_batches(num_tasks):
+    """One worker per GPU, or as many as the CPU can hold at THREADS_PER_BLENDER threads each."""
+    if THREADS_PER_BLENDER:
+        return max(1, min(num_tasks, (os.cpu_count() or 1) // THREADS_PER_BLENDER))
+    return max(1, min(num_tasks, NUM_GPUS))
+
+def init_worker(blend_file, free_gpus, num_concurrent):
+    global worker_blend_file, worker_free_gpus, worker_num_concurrent
+    worker_blend_file = blend_file
+    worker_free_gpus = free_gpus
+    worker_num_concurrent = num_concurrent
+
+def render_task(task):
+    """Pool worker: render one camera task on a free GPU and return the Blender exit code."""
+    start_idx, end_idx = task
+    gpu_idx = worker_free_gpus.get() if worker_free_gpus is not None else None
+    try:
+        process = run_blender_batch(start_idx, end_idx, worker_blend_file, gpu_idx=gpu_idx, threads=THREADS_PER_BLENDER,
+                                    num_concurrent=worker_num_concurrent)
+        return wait_for_batch(start_idx, end_idx, process)
+    finally:
+        if gpu_idx is not None:
+            worker_free_gpus.put(gpu_idx)
 
 def main():
-    for start_idx, end_idx in CAMERA_BATCHES:
-        run_blender_batch(start_idx, end_idx)
-        print("[INFO] Waiting 5 seconds before next batch...")
-        time.sleep(5)  # Optional: give system a short break
+    blend_file = bake_scene()
+    if blend_file is None:
+        return 1
+
+    max_concurrent = get_max_concurrent_batches(CAMERA_COUNT)
+    tasks = get_camera_tasks(max_concurrent)
+    max_concurrent = min(max_concurrent, len(tasks))
+    if max_concurrent == 1:
+        # Nothing runs in parallel, so render the whole rig in one Blender session instead of one launch per task
+        end_idx = CAMERA_COUNT - 1
+        process = run_blender_batch(0, end_idx, blend_file, gpu_idx=None if THREADS_PER_BLENDER else 0,
+                                    threads=THREADS_PER_BLENDER)
+        return 1 if wait_for_batch(0, end_idx, process) != 0 else 0
+
+    print(f"[INFO] Rendering {len(tasks)} camera tasks with {max_concurrent} workers.")
+    failed = 0
+    with multiprocessing.Manager() as manager:
+        free_gpus = None
+        if not THREADS_PER_BLENDER:
+            free_gpus = manager.Queue()
+            for gpu_idx in range(min(NUM_GPUS, max_concurrent)):
+                free_gpus.put(gpu_idx)
+
+        with multiprocessing.Pool(processes=max_concurrent, initializer=init_worker,
+                                  initargs=(blend_file, free_gpus, max_concurrent),
+                                  maxtasksperchild=TASKS_PER_WORKER) as pool:
+            # chunksize=1: each idle worker takes the next task as soon as it finishes its last one
+            for returncode in pool.imap_unordered(render_task, tasks, chunksize=1):
+                failed += returncode != 0
+    return 1 if failed else 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())